@@ -5,43 +5,111 @@ JWT token creation/validation and password hashing
 
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+import asyncio
+import hashlib
+import hmac
+import os
+import threading
+import time
+import bcrypt
+import jwt
+from cachetools import TTLCache
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from .config import settings
 from .database import DatabaseManager
-from .models import TokenData, User
+from .models import TokenData, User, from_db
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt work factor for new password hashes
+BCRYPT_ROUNDS = 12
+
+# bcrypt releases the GIL, so a thread pool keeps hashing off the event loop
+bcrypt_executor = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="bcrypt")
 
 # Security scheme
 security = HTTPBearer()
 
+# JWT signing key and default token lifetime, built once at import
+_SIGNING_KEY = settings.SECRET_KEY.encode('utf-8')
+_ACCESS_TTL = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+
+# Project access levels allowed to manage a project
+_ADMIN_ROLES = frozenset({'admin', 'owner'})
+
+# In-process caches for the authentication hot path
+_user_cache = TTLCache(maxsize=10000, ttl=settings.USER_CACHE_TTL_SECONDS)
+_user_cache_lock = threading.Lock()
+_token_cache = TTLCache(maxsize=10000, ttl=300)
+
+# Successful bcrypt checks, keyed by an HMAC of the credential pair so the
+# cache never holds plaintext passwords. Failed checks are never cached.
+_verify_cache = TTLCache(maxsize=4096, ttl=600)
+_verify_cache_lock = threading.Lock()
+
+# Successful logins for a few seconds, so double submits and retry loops skip
+# both the user lookup and bcrypt. Failed logins are never cached.
+_login_cache = TTLCache(maxsize=1000, ttl=10)
+
+# Project access levels for a minute. Keys embed a per-project version that
+# membership changes bump, so invalidation never has to scan the cache. Only
+# invalidation writes a version, so lookups of arbitrary ids cannot grow it.
+# "No access" is never cached: other workers would keep denying a newly added
+# member until the entry expired.
+_access_cache = TTLCache(maxsize=10000, ttl=60)
+_access_versions = {}
+_access_cache_lock = threading.Lock()
+
+# Per-request memo for repeated lookups, installed by the request middleware in main.py
+request_cache: ContextVar[Optional[dict]] = ContextVar('request_cache', default=None)
+
+def invalidate_user(user_id: int):
+    """Drop a cached user so the next request reloads it from the database"""
+    with _user_cache_lock:
+        _user_cache.pop(user_id, None)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    cache_key = hmac.new(
+        _SIGNING_KEY,
+        plain_password.encode('utf-8') + b'\x00' + hashed_password.encode('utf-8'),
+        hashlib.sha256
+    ).digest()
+    with _verify_cache_lock:
+        if cache_key in _verify_cache:
+            return True
+    
+    if not bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8')):
+        return False
+    
+    with _verify_cache_lock:
+        _verify_cache[cache_key] = True
+    return True
 
 def get_password_hash(password: str) -> str:
     """Generate password hash"""
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode('utf-8')
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    expire = datetime.utcnow() + (expires_delta or _ACCESS_TTL)
     
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _SIGNING_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 def verify_token(token: str) -> TokenData:
     """Verify and decode JWT token"""
+    cached = _token_cache.get(token)
+    if cached is not None:
+        token_data, expires_at = cached
+        if expires_at > time.time():
+            return token_data
+        _token_cache.pop(token, None)
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -49,7 +117,7 @@ def verify_token(token: str) -> TokenData:
     )
     
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = jwt.decode(token, _SIGNING_KEY, algorithms=[settings.ALGORITHM])
         user_id: int = payload.get("sub")
         email: str = payload.get("email")
         
@@ -57,28 +125,48 @@ def verify_token(token: str) -> TokenData:
             raise credentials_exception
             
         token_data = TokenData(user_id=int(user_id), email=email)
+        _token_cache[token] = (token_data, payload["exp"])
         return token_data
         
-    except JWTError:
+    except jwt.PyJWTError:
         raise credentials_exception
 
-def authenticate_user(email: str, password: str) -> Optional[User]:
+async def authenticate_user(email: str, password: str) -> Optional[User]:
     """Authenticate user with email and password"""
+    cache_key = hmac.new(
+        _SIGNING_KEY,
+        email.encode('utf-8') + b'\x00' + password.encode('utf-8'),
+        hashlib.sha256
+    ).digest()
+    user = _login_cache.get(cache_key)
+    if user is not None:
+        return user
+    
     user_data = DatabaseManager.get_user_by_email(email)
     if not user_data:
         return None
     
-    if not verify_password(password, user_data['password_hash']):
+    loop = asyncio.get_running_loop()
+    if not await loop.run_in_executor(bcrypt_executor, verify_password, password, user_data['password_hash']):
         return None
     
-    return User(**user_data)
+    user = from_db(User, user_data)
+    _login_cache[cache_key] = user
+    return user
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
     """Get current authenticated user from JWT token"""
     token = credentials.credentials
     token_data = verify_token(token)
     
-    user_data = DatabaseManager.get_user_by_id(token_data.user_id)
+    with _user_cache_lock:
+        user_data = _user_cache.get(token_data.user_id)
+    if user_data is None:
+        user_data = DatabaseManager.get_user_by_id(token_data.user_id)
+        if user_data is not None:
+            with _user_cache_lock:
+                _user_cache[token_data.user_id] = user_data
+    
     if user_data is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -86,40 +174,46 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    return User(**user_data)
+    return from_db(User, user_data)
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """Get current active user (placeholder for future user status checks)"""
     return current_user
 
-def check_project_access(user_id: int, project_id: int) -> bool:
-    """Check if user has access to a project"""
-    # Check if user is project owner
-    project = DatabaseManager.get_project_by_id(project_id)
-    if not project:
-        return False
+def invalidate_project_access(project_id: int):
+    """Forget cached access levels for a project after its membership changes"""
+    with _access_cache_lock:
+        _access_versions[project_id] = _access_versions.get(project_id, 0) + 1
+
+def _load_project_access(user_id: int, project_id: int) -> Optional[str]:
+    """Get a user's access level on a project through the shared access cache"""
+    with _access_cache_lock:
+        key = (user_id, project_id, _access_versions.get(project_id, 0))
+        access = _access_cache.get(key)
+    if access is not None:
+        return access
     
-    if project['owner_id'] == user_id:
-        return True
+    access = DatabaseManager.get_user_project_access(user_id, project_id)
+    if access is not None:
+        with _access_cache_lock:
+            _access_cache[key] = access
+    return access
+
+def get_project_access(user_id: int, project_id: int) -> Optional[str]:
+    """Get a user's access level on a project, memoized for the current request"""
+    cache = request_cache.get()
+    if cache is None:
+        return _load_project_access(user_id, project_id)
     
-    # Check if user is project member
-    members = DatabaseManager.get_project_members(project_id)
-    return any(member['id'] == user_id for member in members)
+    key = ('access', user_id, project_id)
+    if key not in cache:
+        cache[key] = _load_project_access(user_id, project_id)
+    return cache[key]
+
+def check_project_access(user_id: int, project_id: int) -> bool:
+    """Check if user has access to a project"""
+    return get_project_access(user_id, project_id) is not None
 
 def check_project_admin(user_id: int, project_id: int) -> bool:
     """Check if user is admin or owner of a project"""
-    # Check if user is project owner
-    project = DatabaseManager.get_project_by_id(project_id)
-    if not project:
-        return False
-    
-    if project['owner_id'] == user_id:
-        return True
-    
-    # Check if user is project admin
-    members = DatabaseManager.get_project_members(project_id)
-    for member in members:
-        if member['id'] == user_id and member['role'] in ['admin', 'owner']:
-            return True
-    
-    return False
+    return get_project_access(user_id, project_id) in _ADMIN_ROLES
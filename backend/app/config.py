@@ -18,11 +18,17 @@ class Settings(BaseSettings):
     DB_USER: str = "synergy_user"
     DB_PASSWORD: str = "synergy_password"
     DB_NAME: str = "synergysphere"
+    # At least the previous 10 connections on small hosts; mysql-connector caps pools at 32
+    DB_POOL_SIZE: int = max(10, min(32, 2 * (os.cpu_count() or 1)))
+    # Seconds to wait for a free pooled connection before failing the request
+    DB_POOL_TIMEOUT: int = 10
     
     # JWT settings
     SECRET_KEY: str = "your-secret-key-here-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Kept short so role changes and deactivations propagate quickly
+    USER_CACHE_TTL_SECONDS: int = 3
     
     # SMTP settings
     SMTP_HOST: str = "localhost"
@@ -30,6 +36,9 @@ class Settings(BaseSettings):
     SMTP_USER: str = "your-email@example.com"
     SMTP_PASSWORD: str = "your-email-password"
     SMTP_FROM: str = "noreply@synergysphere.com"
+    # Per-recipient outbound email throttle
+    EMAIL_RATE_LIMIT_PER_MINUTE: int = 10
+    EMAIL_BURST_LIMIT: int = 5
     
     # CORS settings
     CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://127.0.0.1:3000"]
@@ -3,9 +3,15 @@ Database connection and utilities
 """
 
 import mysql.connector
-from mysql.connector import pooling
+from mysql.connector import errorcode, pooling
+from collections import defaultdict
 from contextlib import contextmanager
+from cachetools import LRUCache, TTLCache
+from datetime import datetime
+import asyncio
+import json
 import logging
+import threading
 from .config import settings
 
 logger = logging.getLogger(__name__)
@@ -13,20 +19,49 @@ logger = logging.getLogger(__name__)
 # Connection pool configuration
 pool_config = {
     'pool_name': 'synergy_pool',
-    'pool_size': 10,
-    'pool_reset_session': True,
+    'pool_size': settings.DB_POOL_SIZE,
+    # Resetting the session on checkout would deallocate the server-side
+    # prepared statements cached below
+    'pool_reset_session': False,
     'host': settings.DB_HOST,
     'port': settings.DB_PORT,
     'database': settings.DB_NAME,
     'user': settings.DB_USER,
     'password': settings.DB_PASSWORD,
     'charset': 'utf8mb4',
-    'autocommit': False
+    # Each statement is its own transaction; multi-statement writes open an
+    # explicit transaction instead, so reads never pay for a COMMIT
+    'autocommit': True,
+    # Require the C extension (libmysqlclient) rather than silently falling
+    # back to the pure-Python protocol implementation
+    'use_pure': False
 }
 
 # Global connection pool
 connection_pool = None
 
+# mysql-connector raises PoolError instead of waiting when every connection is
+# checked out, so callers on worker threads queue here for a free slot
+_pool_slots = threading.BoundedSemaphore(pool_config['pool_size'])
+
+# Cursors reused across checkouts of the same pooled connection, keyed by
+# (connection_id, SQL) for prepared statements, which keep their server-side
+# handle open, or (connection_id, None) for the plain dictionary cursor
+_cursors = LRUCache(maxsize=512)
+_cursors_lock = threading.Lock()
+
+# Task status counts per project for the progress endpoint, dropped whenever a
+# task in the project is created or changes status
+_status_counts = TTLCache(maxsize=4096, ttl=30)
+# Bumped on every invalidation so a count computed before a write is never stored
+_status_versions = {}
+_status_counts_lock = threading.Lock()
+
+def _invalidate_status_counts(project_id: int):
+    with _status_counts_lock:
+        _status_counts.pop(project_id, None)
+        _status_versions[project_id] = _status_versions.get(project_id, 0) + 1
+
 def init_db():
     """Initialize database connection pool"""
     global connection_pool
@@ -45,45 +80,95 @@ def init_db():
         logger.error(f"Failed to initialize database: {e}")
         raise
 
+def _acquire_pool_slot() -> bool:
+    """Take a pool slot; only worker threads wait, the event loop thread never blocks"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return _pool_slots.acquire(timeout=settings.DB_POOL_TIMEOUT)
+    return _pool_slots.acquire(blocking=False)
+
 @contextmanager
 def get_db_connection():
     """Get database connection from pool"""
     connection = None
+    if not _acquire_pool_slot():
+        logger.error("Database error: no pooled connection available")
+        raise mysql.connector.errors.PoolError("No pooled connection available")
     try:
         connection = connection_pool.get_connection()
         yield connection
     except mysql.connector.Error as e:
         if connection:
             connection.rollback()
-        logger.error(f"Database error: {e}")
+        # Duplicate keys are expected conflicts (e.g. an already registered email), not faults
+        if e.errno == errorcode.ER_DUP_ENTRY:
+            logger.debug(f"Duplicate key: {e}")
+        else:
+            logger.error(f"Database error: {e}")
         raise
     finally:
         if connection and connection.is_connected():
             connection.close()
+        _pool_slots.release()
 
-def execute_query(query: str, params: tuple = None, fetch_one: bool = False, fetch_all: bool = False):
-    """Execute a database query"""
+@contextmanager
+def transaction():
+    """Run several statements on one connection and commit them atomically"""
     with get_db_connection() as conn:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute(query, params or ())
+        conn.start_transaction()
+        cursor = conn.cursor()
+        try:
+            yield cursor
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+def _execute_cached(query: str, params: tuple, fetch_one: bool, fetch_all: bool, prepared: bool):
+    """Execute a query on the checked-out connection's cached cursor"""
+    with get_db_connection() as conn:
+        key = (conn.connection_id, query if prepared else None)
+        with _cursors_lock:
+            cursor = _cursors.get(key)
+        if cursor is None:
+            cursor = conn.cursor(prepared=prepared, dictionary=True)
+            with _cursors_lock:
+                _cursors[key] = cursor
         
-        if fetch_one:
-            result = cursor.fetchone()
-        elif fetch_all:
-            result = cursor.fetchall()
-        else:
-            result = cursor.lastrowid
+        try:
+            cursor.execute(query, params or ())
             
-        conn.commit()
-        cursor.close()
-        return result
+            if fetch_one:
+                # Drain the result set so no unread rows are left on the connection
+                rows = cursor.fetchall()
+                return rows[0] if rows else None
+            if fetch_all:
+                return cursor.fetchall()
+            return cursor.lastrowid
+        except mysql.connector.Error as e:
+            # Never reuse a cursor that failed mid-query; a rejected duplicate
+            # insert leaves nothing unread, so that cursor stays usable
+            if e.errno != errorcode.ER_DUP_ENTRY:
+                with _cursors_lock:
+                    _cursors.pop(key, None)
+            raise
+
+def execute_query(query: str, params: tuple = None, fetch_one: bool = False, fetch_all: bool = False):
+    """Execute a database query"""
+    return _execute_cached(query, params, fetch_one, fetch_all, prepared=False)
+
+def execute_prepared(query: str, params: tuple = None, fetch_one: bool = False, fetch_all: bool = False):
+    """Execute a query as a server-side prepared statement, reusing the statement per connection"""
+    return _execute_cached(query, params, fetch_one, fetch_all, prepared=True)
 
 def execute_many(query: str, params_list: list):
     """Execute many queries with different parameters"""
     with get_db_connection() as conn:
         cursor = conn.cursor()
         cursor.executemany(query, params_list)
-        conn.commit()
         cursor.close()
         return cursor.rowcount
 
@@ -93,14 +178,14 @@ class DatabaseManager:
     @staticmethod
     def get_user_by_email(email: str):
         """Get user by email"""
-        query = "SELECT * FROM users WHERE email = %s"
-        return execute_query(query, (email,), fetch_one=True)
+        query = "SELECT id, name, email, password_hash, role, created_at FROM users WHERE email = %s"
+        return execute_prepared(query, (email,), fetch_one=True)
     
     @staticmethod
     def get_user_by_id(user_id: int):
         """Get user by ID"""
-        query = "SELECT * FROM users WHERE id = %s"
-        return execute_query(query, (user_id,), fetch_one=True)
+        query = "SELECT id, name, email, role, created_at FROM users WHERE id = %s"
+        return execute_prepared(query, (user_id,), fetch_one=True)
     
     @staticmethod
     def create_user(name: str, email: str, password_hash: str, role: str = 'user'):
@@ -108,28 +193,47 @@ class DatabaseManager:
         query = "INSERT INTO users (name, email, password_hash, role) VALUES (%s, %s, %s, %s)"
         return execute_query(query, (name, email, password_hash, role))
     
+    @staticmethod
+    def create_user_if_absent(name: str, email: str, password_hash: str, role: str = 'user'):
+        """Create a new user, or return None if the email is already registered"""
+        try:
+            return DatabaseManager.create_user(name, email, password_hash, role)
+        except mysql.connector.IntegrityError as e:
+            # users.email is UNIQUE, so the insert itself is the race-free existence check
+            if e.errno == errorcode.ER_DUP_ENTRY:
+                return None
+            raise
+    
     @staticmethod
     def get_user_projects(user_id: int):
         """Get projects for a user"""
         query = """
-        SELECT DISTINCT p.*, u.name as owner_name 
-        FROM projects p
-        JOIN users u ON p.owner_id = u.id
-        LEFT JOIN project_members pm ON p.id = pm.project_id
-        WHERE p.owner_id = %s OR pm.user_id = %s
-        ORDER BY p.created_at DESC
+        (SELECT p.*, u.name as owner_name
+         FROM projects p
+         JOIN users u ON p.owner_id = u.id
+         WHERE p.owner_id = %s)
+        UNION ALL
+        (SELECT p.*, u.name as owner_name
+         FROM project_members pm
+         JOIN projects p ON pm.project_id = p.id
+         JOIN users u ON p.owner_id = u.id
+         WHERE pm.user_id = %s AND p.owner_id <> %s)
+        ORDER BY created_at DESC
         """
-        return execute_query(query, (user_id, user_id), fetch_all=True)
+        return execute_query(query, (user_id, user_id, user_id), fetch_all=True)
     
     @staticmethod
     def create_project(name: str, description: str, owner_id: int):
         """Create a new project"""
         query = "INSERT INTO projects (name, description, owner_id) VALUES (%s, %s, %s)"
-        project_id = execute_query(query, (name, description, owner_id))
-        
-        # Add owner as project member
         member_query = "INSERT INTO project_members (project_id, user_id, role) VALUES (%s, %s, %s)"
-        execute_query(member_query, (project_id, owner_id, 'owner'))
+        
+        with transaction() as cursor:
+            cursor.execute(query, (name, description, owner_id))
+            project_id = cursor.lastrowid
+            
+            # Add owner as project member
+            cursor.execute(member_query, (project_id, owner_id, 'owner'))
         
         return project_id
     
@@ -144,6 +248,33 @@ class DatabaseManager:
         """
         return execute_query(query, (project_id,), fetch_one=True)
     
+    @staticmethod
+    def get_project_with_members(project_id: int):
+        """Get a project with its members attached as a list, in a single query"""
+        query = """
+        SELECT p.*, u.name as owner_name,
+               (SELECT JSON_ARRAYAGG(JSON_OBJECT(
+                           'id', mu.id, 'name', mu.name, 'email', mu.email,
+                           'role', pm.role, 'joined_at', pm.joined_at))
+                FROM project_members pm
+                JOIN users mu ON pm.user_id = mu.id
+                WHERE pm.project_id = p.id) as members
+        FROM projects p
+        JOIN users u ON p.owner_id = u.id
+        WHERE p.id = %s
+        """
+        project = execute_prepared(query, (project_id,), fetch_one=True)
+        if project is None:
+            return None
+        
+        # JSON_ARRAYAGG has no ORDER BY, so restore the get_project_members order here
+        members = json.loads(project['members']) if project['members'] else []
+        for member in members:
+            member['joined_at'] = datetime.fromisoformat(member['joined_at'])
+        members.sort(key=lambda member: member['joined_at'])
+        project['members'] = members
+        return project
+    
     @staticmethod
     def get_project_members(project_id: int):
         """Get project members"""
@@ -156,6 +287,48 @@ class DatabaseManager:
         """
         return execute_query(query, (project_id,), fetch_all=True)
     
+    @staticmethod
+    def is_project_member(project_id: int, user_id: int) -> bool:
+        """Check whether a user is a member of a project"""
+        query = """
+        SELECT EXISTS(
+            SELECT 1 FROM project_members WHERE project_id = %s AND user_id = %s
+        ) as is_member
+        """
+        return bool(execute_prepared(query, (project_id, user_id), fetch_one=True)['is_member'])
+    
+    @staticmethod
+    def get_members_for_projects(project_ids: list):
+        """Get members of several projects in one query, grouped by project id"""
+        members_by_project = defaultdict(list)
+        if not project_ids:
+            return members_by_project
+        
+        # Same JSON_TABLE id list as mark_notifications_read: one statement text for any count
+        query = """
+        SELECT pm.project_id, u.id, u.name, u.email, pm.role, pm.joined_at
+        FROM project_members pm
+        JOIN users u ON pm.user_id = u.id
+        WHERE pm.project_id IN (SELECT id FROM JSON_TABLE(%s, '$[*]' COLUMNS (id INT PATH '$')) AS ids)
+        ORDER BY pm.project_id, pm.joined_at
+        """
+        for member in execute_query(query, (json.dumps(project_ids),), fetch_all=True):
+            members_by_project[member.pop('project_id')].append(member)
+        return members_by_project
+    
+    @staticmethod
+    def get_user_project_access(user_id: int, project_id: int):
+        """Get a user's access level on a project ('owner', 'admin', 'member' or None)"""
+        query = """
+        SELECT CASE WHEN p.owner_id = %s THEN 'owner' ELSE pm.role END AS access
+        FROM projects p
+        LEFT JOIN project_members pm ON pm.project_id = p.id AND pm.user_id = %s
+        WHERE p.id = %s
+        LIMIT 1
+        """
+        result = execute_prepared(query, (user_id, user_id, project_id), fetch_one=True)
+        return result['access'] if result else None
+    
     @staticmethod
     def add_project_member(project_id: int, user_id: int, role: str = 'member'):
         """Add member to project"""
@@ -169,13 +342,17 @@ class DatabaseManager:
         INSERT INTO tasks (project_id, title, description, assignee_id, due_date, created_by) 
         VALUES (%s, %s, %s, %s, %s, %s)
         """
-        return execute_query(query, (project_id, title, description, assignee_id, due_date, created_by))
+        task_id = execute_query(query, (project_id, title, description, assignee_id, due_date, created_by))
+        _invalidate_status_counts(project_id)
+        return task_id
     
     @staticmethod
     def get_project_tasks(project_id: int):
         """Get tasks for a project"""
         query = """
-        SELECT t.*, u.name as assignee_name, c.name as created_by_name
+        SELECT t.id, t.project_id, t.title, t.description, t.assignee_id, t.due_date,
+               t.status, t.created_by, t.created_at, t.updated_at,
+               u.name as assignee_name, c.name as created_by_name
         FROM tasks t
         LEFT JOIN users u ON t.assignee_id = u.id
         LEFT JOIN users c ON t.created_by = c.id
@@ -185,10 +362,50 @@ class DatabaseManager:
         return execute_query(query, (project_id,), fetch_all=True)
     
     @staticmethod
-    def update_task_status(task_id: int, status: str):
-        """Update task status"""
+    def get_task_by_id(task_id: int):
+        """Get a single task with the same columns as get_project_tasks"""
+        query = """
+        SELECT t.id, t.project_id, t.title, t.description, t.assignee_id, t.due_date,
+               t.status, t.created_by, t.created_at, t.updated_at,
+               u.name as assignee_name, c.name as created_by_name
+        FROM tasks t
+        LEFT JOIN users u ON t.assignee_id = u.id
+        LEFT JOIN users c ON t.created_by = c.id
+        WHERE t.id = %s
+        """
+        return execute_prepared(query, (task_id,), fetch_one=True)
+    
+    @staticmethod
+    def update_task_status(task_id: int, status: str, project_id: int):
+        """Update task status; project_id is the task's project, whose cached counts are dropped"""
         query = "UPDATE tasks SET status = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s"
-        return execute_query(query, (status, task_id))
+        result = execute_query(query, (status, task_id))
+        _invalidate_status_counts(project_id)
+        return result
+    
+    @staticmethod
+    def get_project_status_counts(project_id: int):
+        """Get the number of tasks in each status for a project"""
+        with _status_counts_lock:
+            counts = _status_counts.get(project_id)
+            version = _status_versions.get(project_id, 0)
+        if counts is not None:
+            return dict(counts)
+        
+        query = """
+        SELECT status, COUNT(*) AS task_count
+        FROM tasks
+        WHERE project_id = %s
+        GROUP BY status
+        """
+        counts = {'todo': 0, 'in_progress': 0, 'done': 0}
+        for row in execute_prepared(query, (project_id,), fetch_all=True):
+            counts[row['status']] = row['task_count']
+        
+        with _status_counts_lock:
+            if _status_versions.get(project_id, 0) == version:
+                _status_counts[project_id] = counts
+        return dict(counts)
     
     @staticmethod
     def create_notification(user_id: int, title: str, body: str, project_id: int = None, task_id: int = None):
@@ -197,15 +414,60 @@ class DatabaseManager:
         return execute_query(query, (user_id, project_id, task_id, title, body))
     
     @staticmethod
-    def get_user_notifications(user_id: int, limit: int = 50):
-        """Get user notifications"""
+    def create_notifications_bulk(rows: list):
+        """Create many notifications in one multi-row INSERT
+        
+        Each row is a (user_id, project_id, task_id, title, body) tuple.
+        """
+        if not rows:
+            return 0
+        query = "INSERT INTO notifications (user_id, project_id, task_id, title, body) VALUES (%s, %s, %s, %s, %s)"
+        return execute_many(query, rows)
+    
+    @staticmethod
+    def get_user_notifications(user_id: int, limit: int = 50, before_created_at=None, before_id: int = None):
+        """Get user notifications, newest first, optionally starting after a (created_at, id) cursor"""
+        if before_created_at is None or before_id is None:
+            query = """
+            SELECT n.*, p.name as project_name, t.title as task_title
+            FROM notifications n
+            LEFT JOIN projects p ON n.project_id = p.id
+            LEFT JOIN tasks t ON n.task_id = t.id
+            WHERE n.user_id = %s
+            ORDER BY n.created_at DESC, n.id DESC
+            LIMIT %s
+            """
+            return execute_query(query, (user_id, limit), fetch_all=True)
+        
+        # Keyset page: seeks into idx_notifications_user_created instead of skipping rows
         query = """
         SELECT n.*, p.name as project_name, t.title as task_title
         FROM notifications n
         LEFT JOIN projects p ON n.project_id = p.id
         LEFT JOIN tasks t ON n.task_id = t.id
         WHERE n.user_id = %s
-        ORDER BY n.created_at DESC
+        AND (n.created_at < %s OR (n.created_at = %s AND n.id < %s))
+        ORDER BY n.created_at DESC, n.id DESC
         LIMIT %s
         """
-        return execute_query(query, (user_id, limit), fetch_all=True)
+        return execute_query(
+            query, (user_id, before_created_at, before_created_at, before_id, limit), fetch_all=True
+        )
+    
+    @staticmethod
+    def mark_notifications_read(user_id: int, notification_ids: list):
+        """Mark a user's notifications as read; returns the number of rows changed"""
+        # The ids travel as one JSON array parameter so the statement text is
+        # the same whatever the list length
+        query = """
+        UPDATE notifications
+        SET is_read = TRUE
+        WHERE user_id = %s
+        AND id IN (SELECT id FROM JSON_TABLE(%s, '$[*]' COLUMNS (id INT PATH '$')) AS ids)
+        """
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, (user_id, json.dumps(notification_ids)))
+            changed = cursor.rowcount
+            cursor.close()
+            return changed
@@ -0,0 +1,223 @@
+"""
+Email delivery service
+Reuses a single authenticated SMTP connection for outgoing mail and
+delivers queued emails from a background task
+"""
+
+import asyncio
+import smtplib
+import threading
+import time
+import logging
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from typing import Optional
+from cachetools import TTLCache
+from jinja2 import Template
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Email templates, compiled once at import time
+DEADLINE_REMINDER_SUBJECT_TPL = Template("Deadline Reminder: {{ task_title }}")
+DEADLINE_REMINDER_BODY_TPL = Template("""\
+Hello {{ assignee_name }},
+
+This is a reminder that your task "{{ task_title }}" in project "{{ project_name }}" is due on {{ due_date }}.
+
+Please make sure to complete it on time.
+
+Best regards,
+SynergySphere Team
+""")
+
+class TokenBucket:
+    """Per-key token bucket allowing `capacity` sends in a burst, refilled at `rate` tokens per second"""
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        # A bucket left alone for capacity / rate seconds is full again, so it can be forgotten
+        self._buckets = TTLCache(maxsize=10000, ttl=capacity / rate)
+        self._lock = threading.Lock()
+    
+    def consume(self, key) -> float:
+        """Take a token for key; returns 0 on success, else seconds until a token is available"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last_refill = self._buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - last_refill) * self.rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / self.rate
+
+class EmailService:
+    """SMTP sender that keeps its connection open between emails"""
+    
+    def __init__(self):
+        self._conn = None
+        # smtplib connections are not thread-safe
+        self._conn_lock = threading.Lock()
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._rate_limiter = TokenBucket(
+            rate=settings.EMAIL_RATE_LIMIT_PER_MINUTE / 60,
+            capacity=settings.EMAIL_BURST_LIMIT
+        )
+    
+    def _get_connection(self) -> smtplib.SMTP:
+        """Return the open SMTP connection, connecting and logging in if needed"""
+        if self._conn is None:
+            server = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT)
+            try:
+                server.starttls()  # Enable security
+                server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+            except Exception:
+                # Don't leak the socket of a half-set-up session
+                server.close()
+                raise
+            self._conn = server
+        return self._conn
+    
+    def _close_connection(self):
+        """Close the SMTP connection, ignoring errors from a dead socket"""
+        if self._conn is None:
+            return
+        try:
+            self._conn.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self._conn = None
+    
+    def _build_message(self, to_email: str, subject: str, body: str, is_html: bool = False) -> str:
+        """Render a MIME message ready for sendmail"""
+        msg = MIMEMultipart()
+        msg['From'] = settings.SMTP_FROM
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        
+        # Add body to email
+        msg.attach(MIMEText(body, 'html' if is_html else 'plain'))
+        return msg.as_string()
+    
+    def _sendmail(self, to_email: str, text: str):
+        """Send a rendered message; the caller must hold the connection lock"""
+        try:
+            self._get_connection().sendmail(settings.SMTP_FROM, to_email, text)
+        except smtplib.SMTPServerDisconnected:
+            # The server dropped an idle connection; retry once on a fresh one
+            self._close_connection()
+            self._get_connection().sendmail(settings.SMTP_FROM, to_email, text)
+        except smtplib.SMTPException:
+            # Rejected recipient, sender or data: the session is still usable
+            raise
+        except OSError:
+            # Socket failure mid-send: the message may already have been accepted,
+            # so drop the broken session but do not resend
+            self._close_connection()
+            raise
+    
+    def send_email(self, to_email: str, subject: str, body: str, is_html: bool = False):
+        """Send email notification"""
+        self.send_bulk([(to_email, subject, body, is_html)])
+    
+    def send_bulk(self, messages: list):
+        """Send (to_email, subject, body, is_html) emails back to back in one SMTP session"""
+        # Render everything before taking the lock to keep the SMTP session busy only with sends
+        rendered = []
+        for to_email, subject, body, is_html in messages:
+            try:
+                rendered.append((to_email, self._build_message(to_email, subject, body, is_html)))
+            except Exception as e:
+                logger.error(f"Failed to build email to {to_email}: {e}")
+        
+        with self._conn_lock:
+            for to_email, text in rendered:
+                try:
+                    self._sendmail(to_email, text)
+                    logger.info(f"Email sent successfully to {to_email}")
+                except Exception as e:
+                    logger.error(f"Failed to send email to {to_email}: {e}")
+    
+    def start_worker(self):
+        """Start the background email worker on the running event loop"""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._worker = self._loop.create_task(self._email_worker())
+        logger.info("Email worker started")
+    
+    async def stop_worker(self):
+        """Stop the background email worker"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        self._queue = None
+    
+    async def _email_worker(self):
+        """Deliver queued batches of emails off the event loop"""
+        while True:
+            messages = await self._queue.get()
+            try:
+                ready = self._apply_rate_limit(messages)
+                if ready:
+                    await self._loop.run_in_executor(None, self.send_bulk, ready)
+            finally:
+                self._queue.task_done()
+    
+    def _apply_rate_limit(self, messages: list) -> list:
+        """Return the messages whose recipient has a token; re-queue the rest for later"""
+        ready = []
+        for message in messages:
+            wait = self._rate_limiter.consume(message[0])
+            if wait:
+                self._loop.call_later(wait, self._requeue, message)
+            else:
+                ready.append(message)
+        return ready
+    
+    def _requeue(self, message: tuple):
+        """Put a throttled message back on the queue if the worker is still running"""
+        if self._queue is not None:
+            self._queue.put_nowait([message])
+    
+    def enqueue_email(self, to_email: str, subject: str, body: str, is_html: bool = False):
+        """Queue an email for background delivery (safe to call from any thread)"""
+        self.enqueue_bulk([(to_email, subject, body, is_html)])
+    
+    def enqueue_bulk(self, messages: list):
+        """Queue (to_email, subject, body, is_html) emails to be sent in one SMTP session"""
+        if not messages:
+            return
+        if self._queue is None:
+            # No worker running (e.g. scripts or tests); send inline
+            self.send_bulk(messages)
+            return
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, list(messages))
+    
+    def build_deadline_reminder_email(self, to_email: str, assignee_name: str, task_title: str,
+                                      project_name: str, due_date) -> tuple:
+        """Render a task deadline reminder as a (to_email, subject, body, is_html) message"""
+        subject = DEADLINE_REMINDER_SUBJECT_TPL.render(task_title=task_title)
+        body = DEADLINE_REMINDER_BODY_TPL.render(
+            assignee_name=assignee_name,
+            task_title=task_title,
+            project_name=project_name,
+            due_date=due_date
+        )
+        return (to_email, subject, body, False)
+    
+    def close(self):
+        """Close the SMTP connection"""
+        with self._conn_lock:
+            self._close_connection()
+
+email_service = EmailService()
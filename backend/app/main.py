@@ -3,17 +3,21 @@ SynergySphere FastAPI Backend
 Main application entry point
 """
 
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer
+from anyio import to_thread
 import uvicorn
 import os
 from dotenv import load_dotenv
 
 from .config import settings
+from .auth import request_cache
 from .database import init_db
+from .email_service import email_service
 from .routers import auth, projects, tasks, comments, notifications, websocket
-from .scheduler import start_scheduler
+from .scheduler import start_scheduler, stop_scheduler
 
 # Load environment variables
 load_dotenv()
@@ -22,7 +26,8 @@ load_dotenv()
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
-    description="Team collaboration platform with real-time updates"
+    description="Team collaboration platform with real-time updates",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -34,6 +39,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def request_cache_middleware(request: Request, call_next):
+    """Give each request a fresh memo for repeated lookups"""
+    token = request_cache.set({})
+    try:
+        return await call_next(request)
+    finally:
+        request_cache.reset(token)
+
 # Security
 security = HTTPBearer()
 
@@ -48,13 +62,19 @@ app.include_router(websocket.router, prefix="/api/ws", tags=["websocket"])
 @app.on_event("startup")
 async def startup_event():
     """Initialize database and start background scheduler"""
+    # No more worker threads than pooled connections, so threads waiting on the
+    # pool cannot pile up behind requests served on the event loop
+    to_thread.current_default_thread_limiter().total_tokens = settings.DB_POOL_SIZE
     init_db()
+    email_service.start_worker()
     start_scheduler()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
-    pass
+    stop_scheduler()
+    await email_service.stop_worker()
+    email_service.close()
 
 @app.get("/")
 async def root():
@@ -2,11 +2,13 @@
 Pydantic models for request/response validation
 """
 
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, Field, field_validator
+from typing import Optional, List, Type, TypeVar
 from datetime import datetime, date
 from enum import Enum
 
+from .config import settings
+
 # Enums
 class UserRole(str, Enum):
     admin = "admin"
@@ -34,9 +36,15 @@ class UserCreate(BaseModel):
     password: str = Field(..., min_length=6)
 
 class UserLogin(BaseModel):
-    email: EmailStr
+    # Only used as a lookup key, so skip full email-validator parsing
+    email: str = Field(..., max_length=255)
     password: str
 
+    @field_validator('email')
+    @classmethod
+    def normalize_email(cls, value: str) -> str:
+        return value.strip().lower()
+
 class User(BaseModel):
     id: int
     name: str
@@ -198,3 +206,11 @@ class ErrorResponse(BaseResponse):
 
 # Update Comment model to handle self-referencing
 Comment.model_rebuild()
+
+ModelT = TypeVar('ModelT', bound=BaseModel)
+
+def from_db(model: Type[ModelT], row: dict) -> ModelT:
+    """Build a model from a trusted database row, validating only in DEBUG mode"""
+    if settings.DEBUG:
+        return model(**row)
+    return model.model_construct(**{k: v for k, v in row.items() if k in model.model_fields})
@@ -4,14 +4,15 @@ Register, login, logout functionality
 """
 
 from fastapi import APIRouter, HTTPException, status, Depends
-from datetime import timedelta
+import asyncio
 import logging
 
 from ..models import (
-    UserCreate, UserLogin, LoginResponse, UserResponse, User, Token, ErrorResponse
+    UserCreate, UserLogin, LoginResponse, UserResponse, User, Token, ErrorResponse, from_db
 )
 from ..auth import (
-    authenticate_user, create_access_token, get_password_hash, get_current_active_user
+    authenticate_user, create_access_token, get_password_hash, get_current_active_user,
+    bcrypt_executor
 )
 from ..database import DatabaseManager
 from ..config import settings
@@ -23,25 +24,23 @@ logger = logging.getLogger(__name__)
 async def register(user_data: UserCreate):
     """Register a new user"""
     try:
-        # Check if user already exists
-        existing_user = DatabaseManager.get_user_by_email(user_data.email)
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-        
-        # Hash password and create user
-        hashed_password = get_password_hash(user_data.password)
-        user_id = DatabaseManager.create_user(
+        # Hash password and create user; the UNIQUE email key rejects duplicates
+        loop = asyncio.get_running_loop()
+        hashed_password = await loop.run_in_executor(bcrypt_executor, get_password_hash, user_data.password)
+        user_id = DatabaseManager.create_user_if_absent(
             name=user_data.name,
             email=user_data.email,
             password_hash=hashed_password
         )
+        if user_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered"
+            )
         
         # Get created user
         created_user = DatabaseManager.get_user_by_id(user_id)
-        user = User(**created_user)
+        user = from_db(User, created_user)
         
         logger.info(f"User registered successfully: {user_data.email}")
         return UserResponse(
@@ -64,7 +63,7 @@ async def login(login_data: UserLogin):
     """Login user and return JWT token"""
     try:
         # Authenticate user
-        user = authenticate_user(login_data.email, login_data.password)
+        user = await authenticate_user(login_data.email, login_data.password)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -72,11 +71,9 @@ async def login(login_data: UserLogin):
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        # Create access token
-        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        # Create access token (default lifetime from settings)
         access_token = create_access_token(
-            data={"sub": str(user.id), "email": user.email},
-            expires_delta=access_token_expires
+            data={"sub": str(user.id), "email": user.email}
         )
         
         token = Token(
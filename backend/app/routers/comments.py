@@ -4,6 +4,8 @@ Threaded discussions for projects and tasks
 """
 
 from fastapi import APIRouter, HTTPException, status, Depends, Path, Query
+from fastapi.concurrency import run_in_threadpool
+from datetime import datetime
 import logging
 from typing import Optional
 
@@ -18,34 +20,46 @@ logger = logging.getLogger(__name__)
 async def get_comments(
     project_id: Optional[int] = Query(None),
     task_id: Optional[int] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    before_created_at: Optional[datetime] = Query(None, description="created_at of the oldest comment on the previous page"),
+    before_id: Optional[int] = Query(None, description="id of the oldest comment on the previous page"),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get comments for a project or task"""
+    """Get comments for a project or task, the newest page first, oldest-first within the page"""
     try:
         if not project_id and not task_id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Either project_id or task_id must be provided"
             )
+        if (before_created_at is None) != (before_id is None):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="before_created_at and before_id must be provided together"
+            )
         
         if project_id:
-            query = """
-            SELECT c.*, u.name as author_name
-            FROM comments c
-            JOIN users u ON c.author_id = u.id
-            WHERE c.project_id = %s
-            ORDER BY c.created_at ASC
-            """
-            comments_data = execute_query(query, (project_id,), fetch_all=True)
+            thread_filter, params = "c.project_id = %s", [project_id]
         else:
-            query = """
-            SELECT c.*, u.name as author_name
-            FROM comments c
-            JOIN users u ON c.author_id = u.id
-            WHERE c.task_id = %s
-            ORDER BY c.created_at ASC
-            """
-            comments_data = execute_query(query, (task_id,), fetch_all=True)
+            thread_filter, params = "c.task_id = %s", [task_id]
+        if before_id is not None:
+            # Keyset on the sort key itself so the index seek starts at the cursor
+            thread_filter += " AND (c.created_at < %s OR (c.created_at = %s AND c.id < %s))"
+            params.extend([before_created_at, before_created_at, before_id])
+        params.append(limit)
+        
+        # Walk the (thread, created_at) index backwards and stop after one page
+        query = f"""
+        SELECT c.id, c.project_id, c.task_id, c.parent_comment_id, c.author_id,
+               c.content, c.created_at, u.name as author_name
+        FROM comments c
+        JOIN users u ON c.author_id = u.id
+        WHERE {thread_filter}
+        ORDER BY c.created_at DESC, c.id DESC
+        LIMIT %s
+        """
+        comments_data = await run_in_threadpool(execute_query, query, tuple(params), fetch_all=True)
+        comments_data.reverse()
         
         return CommentListResponse(
             success=True,
@@ -81,7 +95,7 @@ async def create_comment(
         INSERT INTO comments (project_id, task_id, parent_comment_id, author_id, content)
         VALUES (%s, %s, %s, %s, %s)
         """
-        comment_id = execute_query(query, (
+        comment_id = await run_in_threadpool(execute_query, query, (
             project_id,
             task_id,
             comment_data.parent_comment_id,
@@ -2,23 +2,41 @@
 Notifications endpoints
 """
 
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi.concurrency import run_in_threadpool
+from datetime import datetime
+from typing import Optional
 import logging
 
 from ..models import NotificationListResponse, User, MarkNotificationRequest
 from ..auth import get_current_active_user
-from ..database import DatabaseManager, execute_query
+from ..database import DatabaseManager
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 @router.get("/", response_model=NotificationListResponse)
 async def get_user_notifications(
+    limit: int = Query(50, ge=1, le=200),
+    before_created_at: Optional[datetime] = Query(None, description="created_at of the last notification on the previous page"),
+    before_id: Optional[int] = Query(None, description="id of the last notification on the previous page"),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get user notifications"""
     try:
-        notifications = DatabaseManager.get_user_notifications(current_user.id)
+        if (before_created_at is None) != (before_id is None):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="before_created_at and before_id must be provided together"
+            )
+        
+        notifications = await run_in_threadpool(
+            DatabaseManager.get_user_notifications,
+            current_user.id,
+            limit=limit,
+            before_created_at=before_created_at,
+            before_id=before_id
+        )
         
         return NotificationListResponse(
             success=True,
@@ -26,6 +44,8 @@ async def get_user_notifications(
             data=notifications
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to get notifications: {e}")
         raise HTTPException(
@@ -40,22 +60,15 @@ async def mark_notifications_read(
 ):
     """Mark notifications as read"""
     try:
-        if not request.notification_ids:
+        notification_ids = sorted(set(request.notification_ids))
+        if not notification_ids:
             return {"success": True, "message": "No notifications to mark"}
         
-        placeholders = ','.join(['%s'] * len(request.notification_ids))
-        query = f"""
-        UPDATE notifications 
-        SET is_read = TRUE 
-        WHERE id IN ({placeholders}) AND user_id = %s
-        """
-        
-        params = request.notification_ids + [current_user.id]
-        execute_query(query, tuple(params))
+        marked = await run_in_threadpool(DatabaseManager.mark_notifications_read, current_user.id, notification_ids)
         
         return {
             "success": True,
-            "message": f"Marked {len(request.notification_ids)} notifications as read"
+            "message": f"Marked {marked} notifications as read"
         }
         
     except Exception as e:
@@ -3,15 +3,17 @@ Projects endpoints
 CRUD operations and member management
 """
 
-from fastapi import APIRouter, HTTPException, status, Depends, Path
+from fastapi import APIRouter, HTTPException, status, Depends, Path, BackgroundTasks
 from typing import List
 import logging
 
 from ..models import (
     ProjectCreate, ProjectResponse, ProjectListResponse, AddMemberRequest,
-    Project, ProjectMember, User, ProgressResponse, ProjectProgress
+    Project, ProjectMember, User, ProgressResponse, ProjectProgress, from_db
+)
+from ..auth import (
+    get_current_active_user, check_project_access, check_project_admin, invalidate_project_access
 )
-from ..auth import get_current_active_user, check_project_access, check_project_admin
 from ..database import DatabaseManager
 
 router = APIRouter()
@@ -24,12 +26,15 @@ async def get_user_projects(current_user: User = Depends(get_current_active_user
         projects_data = DatabaseManager.get_user_projects(current_user.id)
         projects = []
         
+        # Fetch members for every project at once instead of one query per project
+        members_by_project = DatabaseManager.get_members_for_projects(
+            [project_data['id'] for project_data in projects_data]
+        )
+        
         for project_data in projects_data:
-            # Get project members
-            members_data = DatabaseManager.get_project_members(project_data['id'])
-            members = [ProjectMember(**member) for member in members_data]
+            members = [from_db(ProjectMember, member) for member in members_by_project.get(project_data['id'], [])]
             
-            project = Project(**project_data, members=members)
+            project = from_db(Project, {**project_data, 'members': members})
             projects.append(project)
         
         return ProjectListResponse(
@@ -59,11 +64,9 @@ async def create_project(
         )
         
         # Get created project with members
-        project_info = DatabaseManager.get_project_by_id(project_id)
-        members_data = DatabaseManager.get_project_members(project_id)
-        members = [ProjectMember(**member) for member in members_data]
-        
-        project = Project(**project_info, members=members)
+        project_info = DatabaseManager.get_project_with_members(project_id)
+        members = [from_db(ProjectMember, member) for member in project_info['members']]
+        project = from_db(Project, {**project_info, 'members': members})
         
         logger.info(f"Project created: {project_data.name} by user {current_user.id}")
         return ProjectResponse(
@@ -93,18 +96,15 @@ async def get_project(
                 detail="Access denied to this project"
             )
         
-        project_data = DatabaseManager.get_project_by_id(project_id)
+        project_data = DatabaseManager.get_project_with_members(project_id)
         if not project_data:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Project not found"
             )
         
-        # Get project members
-        members_data = DatabaseManager.get_project_members(project_id)
-        members = [ProjectMember(**member) for member in members_data]
-        
-        project = Project(**project_data, members=members)
+        members = [from_db(ProjectMember, member) for member in project_data['members']]
+        project = from_db(Project, {**project_data, 'members': members})
         
         return ProjectResponse(
             success=True,
@@ -125,6 +125,7 @@ async def get_project(
 async def add_project_member(
     project_id: int = Path(..., description="Project ID"),
     member_request: AddMemberRequest = ...,
+    background_tasks: BackgroundTasks = ...,
     current_user: User = Depends(get_current_active_user)
 ):
     """Add a member to the project"""
@@ -145,8 +146,7 @@ async def add_project_member(
             )
         
         # Check if user is already a member
-        members = DatabaseManager.get_project_members(project_id)
-        if any(member['id'] == user_to_add['id'] for member in members):
+        if DatabaseManager.is_project_member(project_id, user_to_add['id']):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="User is already a member of this project"
@@ -158,9 +158,11 @@ async def add_project_member(
             user_id=user_to_add['id'],
             role=member_request.role
         )
+        invalidate_project_access(project_id)
         
-        # Create notification for the added user
-        DatabaseManager.create_notification(
+        # Create notification for the added user after the response is sent
+        background_tasks.add_task(
+            DatabaseManager.create_notification,
             user_id=user_to_add['id'],
             project_id=project_id,
             title="Added to Project",
@@ -196,12 +198,12 @@ async def get_project_progress(
                 detail="Access denied to this project"
             )
         
-        tasks = DatabaseManager.get_project_tasks(project_id)
+        status_counts = DatabaseManager.get_project_status_counts(project_id)
         
-        total_tasks = len(tasks)
-        completed_tasks = sum(1 for task in tasks if task['status'] == 'done')
-        in_progress_tasks = sum(1 for task in tasks if task['status'] == 'in_progress')
-        todo_tasks = sum(1 for task in tasks if task['status'] == 'todo')
+        total_tasks = sum(status_counts.values())
+        completed_tasks = status_counts['done']
+        in_progress_tasks = status_counts['in_progress']
+        todo_tasks = status_counts['todo']
         
         completion_percentage = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
         
@@ -3,11 +3,12 @@ Tasks endpoints
 CRUD operations for task management
 """
 
-from fastapi import APIRouter, HTTPException, status, Depends, Path
+from fastapi import APIRouter, HTTPException, status, Depends, Path, BackgroundTasks
+from fastapi.responses import ORJSONResponse
 import logging
 
 from ..models import (
-    TaskCreate, TaskUpdate, TaskResponse, TaskListResponse, Task, User
+    TaskCreate, TaskUpdate, TaskResponse, TaskListResponse, Task, TaskStatus, User, from_db
 )
 from ..auth import get_current_active_user, check_project_access
 from ..database import DatabaseManager
@@ -15,6 +16,8 @@ from ..database import DatabaseManager
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+_TASK_STATUSES = frozenset(task_status.value for task_status in TaskStatus)
+
 @router.get("/project/{project_id}", response_model=TaskListResponse)
 async def get_project_tasks(
     project_id: int = Path(..., description="Project ID"),
@@ -29,13 +32,15 @@ async def get_project_tasks(
             )
         
         tasks_data = DatabaseManager.get_project_tasks(project_id)
-        tasks = [Task(**task) for task in tasks_data]
         
-        return TaskListResponse(
-            success=True,
-            message=f"Retrieved {len(tasks)} tasks",
-            data=tasks
-        )
+        # The rows already have exactly the Task fields, and orjson handles the
+        # date columns natively, so serialize them without building models.
+        # response_model stays on the route for the OpenAPI schema.
+        return ORJSONResponse({
+            "success": True,
+            "message": f"Retrieved {len(tasks_data)} tasks",
+            "data": tasks_data
+        })
         
     except HTTPException:
         raise
@@ -50,6 +55,7 @@ async def get_project_tasks(
 async def create_task(
     project_id: int = Path(..., description="Project ID"),
     task_data: TaskCreate = ...,
+    background_tasks: BackgroundTasks = ...,
     current_user: User = Depends(get_current_active_user)
 ):
     """Create a new task"""
@@ -69,9 +75,10 @@ async def create_task(
             created_by=current_user.id
         )
         
-        # Create notification if task is assigned
+        # Create notification if task is assigned, after the response is sent
         if task_data.assignee_id:
-            DatabaseManager.create_notification(
+            background_tasks.add_task(
+                DatabaseManager.create_notification,
                 user_id=task_data.assignee_id,
                 project_id=project_id,
                 task_id=task_id,
@@ -80,9 +87,8 @@ async def create_task(
             )
         
         # Get created task
-        tasks = DatabaseManager.get_project_tasks(project_id)
-        created_task = next((t for t in tasks if t['id'] == task_id), None)
-        task = Task(**created_task)
+        created_task = DatabaseManager.get_task_by_id(task_id)
+        task = from_db(Task, created_task)
         
         return TaskResponse(
             success=True,
@@ -108,13 +114,26 @@ async def update_task_status(
     """Update task status"""
     try:
         new_status = status_update.get('status')
-        if new_status not in ['todo', 'in_progress', 'done']:
+        if new_status not in _TASK_STATUSES:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid status"
             )
         
-        DatabaseManager.update_task_status(task_id, new_status)
+        task = DatabaseManager.get_task_by_id(task_id)
+        if not task:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Task not found"
+            )
+        
+        if not check_project_access(current_user.id, task['project_id']):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied to this project"
+            )
+        
+        DatabaseManager.update_task_status(task_id, new_status, task['project_id'])
         
         return {
             "success": True,
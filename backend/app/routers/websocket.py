@@ -3,52 +3,81 @@ WebSocket endpoints for real-time updates
 """
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-import json
+import asyncio
 import logging
-from typing import List, Dict
+import orjson
+from typing import Any, Dict, Set
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# A peer that cannot take a frame within this many seconds is dropped
+SEND_TIMEOUT = 5
+
+ORJSON_OPTS = orjson.OPT_NON_STR_KEYS
+
+def encode_message(message: Any) -> str:
+    """Serialize a server-built message once; strings are passed through as-is"""
+    if isinstance(message, str):
+        return message
+    # Browsers hand binary frames to onmessage as Blobs, so keep sending text frames
+    return orjson.dumps(message, option=ORJSON_OPTS).decode('utf-8')
+
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.project_connections: Dict[int, List[WebSocket]] = {}
+        self.active_connections: Set[WebSocket] = set()
+        self.project_connections: Dict[int, Set[WebSocket]] = {}
 
     async def connect(self, websocket: WebSocket, project_id: int = None):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections.add(websocket)
         
         if project_id:
-            if project_id not in self.project_connections:
-                self.project_connections[project_id] = []
-            self.project_connections[project_id].append(websocket)
+            self.project_connections.setdefault(project_id, set()).add(websocket)
 
     def disconnect(self, websocket: WebSocket, project_id: int = None):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        self.active_connections.discard(websocket)
         
         if project_id and project_id in self.project_connections:
-            if websocket in self.project_connections[project_id]:
-                self.project_connections[project_id].remove(websocket)
+            connections = self.project_connections[project_id]
+            connections.discard(websocket)
+            if not connections:
+                del self.project_connections[project_id]
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
 
-    async def broadcast_to_project(self, message: str, project_id: int):
+    async def _send_all(self, message: str, connections) -> list:
+        """Send to all connections concurrently and return the ones that failed"""
+        connections = list(connections)
+        results = await asyncio.gather(
+            *(asyncio.wait_for(connection.send_text(message), SEND_TIMEOUT) for connection in connections),
+            return_exceptions=True
+        )
+        return [connection for connection, result in zip(connections, results) if isinstance(result, Exception)]
+
+    async def _prune(self, dead_connections: list):
+        """Forget and close connections whose last send failed or timed out"""
+        for websocket in dead_connections:
+            self.active_connections.discard(websocket)
+            for project_id in [pid for pid, conns in self.project_connections.items() if websocket in conns]:
+                self.disconnect(websocket, project_id)
+        
+        # Closing ends the peer's endpoint loop and lets the client reconnect;
+        # the socket may already be broken, so failures are ignored
+        await asyncio.gather(
+            *(asyncio.wait_for(websocket.close(code=1011), SEND_TIMEOUT) for websocket in dead_connections),
+            return_exceptions=True
+        )
+
+    async def broadcast_to_project(self, message: Any, project_id: int):
+        """Send a message to every socket on a project; non-string messages are serialized once"""
         if project_id in self.project_connections:
-            for connection in self.project_connections[project_id]:
-                try:
-                    await connection.send_text(message)
-                except:
-                    pass
-
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except:
-                pass
+            await self._prune(await self._send_all(encode_message(message), self.project_connections[project_id]))
+
+    async def broadcast(self, message: Any):
+        """Send a message to every connected socket; non-string messages are serialized once"""
+        await self._prune(await self._send_all(encode_message(message), self.active_connections))
 
 manager = ConnectionManager()
 
@@ -58,7 +87,12 @@ async def websocket_project_endpoint(websocket: WebSocket, project_id: int):
     try:
         while True:
             data = await websocket.receive_text()
-            message_data = json.loads(data)
+            
+            # Only relay well-formed JSON; the frame itself is forwarded untouched
+            try:
+                orjson.loads(data)
+            except orjson.JSONDecodeError:
+                continue
             
             # Echo message to all project members
             await manager.broadcast_to_project(data, project_id)
@@ -2,111 +2,74 @@
 Background scheduler for deadline reminders and email notifications
 """
 
-from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
-import smtplib
+from fastapi.concurrency import run_in_threadpool
 import logging
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from datetime import datetime, date, timedelta
+from datetime import datetime
 
-from .config import settings
 from .database import execute_query, DatabaseManager
+from .email_service import email_service
 
 logger = logging.getLogger(__name__)
-scheduler = BackgroundScheduler()
+# Runs jobs on the application's event loop; start_scheduler must be called from it
+scheduler = AsyncIOScheduler()
 
-def send_email(to_email: str, subject: str, body: str):
-    """Send email notification"""
-    try:
-        # Create message
-        msg = MIMEMultipart()
-        msg['From'] = settings.SMTP_FROM
-        msg['To'] = to_email
-        msg['Subject'] = subject
-        
-        # Add body to email
-        msg.attach(MIMEText(body, 'plain'))
-        
-        # Gmail SMTP configuration
-        server = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT)
-        server.starttls()  # Enable security
-        server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-        
-        # Send email
-        text = msg.as_string()
-        server.sendmail(settings.SMTP_FROM, to_email, text)
-        server.quit()
-        
-        logger.info(f"Email sent successfully to {to_email}")
-        
-    except Exception as e:
-        logger.error(f"Failed to send email to {to_email}: {e}")
-
-def check_upcoming_deadlines():
+async def check_upcoming_deadlines():
     """Check for tasks with upcoming deadlines and send reminders"""
     try:
-        # Get tasks due in the next 3 days
-        tomorrow = date.today() + timedelta(days=1)
-        three_days = date.today() + timedelta(days=3)
-        
+        # Get tasks due in the next 3 days whose assignee has not been reminded today;
+        # dates come from the database clock, like the CURDATE() reminder check
         query = """
         SELECT t.id, t.title, t.due_date, t.assignee_id,
+               DATEDIFF(t.due_date, CURDATE()) as days_until_due,
                u.name as assignee_name, u.email as assignee_email,
                p.name as project_name
         FROM tasks t
         JOIN users u ON t.assignee_id = u.id
         JOIN projects p ON t.project_id = p.id
-        WHERE t.due_date BETWEEN %s AND %s
+        LEFT JOIN notifications n ON n.task_id = t.id
+            AND n.user_id = t.assignee_id
+            AND n.title = 'Deadline Reminder'
+            AND n.created_at >= CURDATE()
+            AND n.created_at < CURDATE() + INTERVAL 1 DAY
+        WHERE t.due_date BETWEEN CURDATE() + INTERVAL 1 DAY AND CURDATE() + INTERVAL 3 DAY
         AND t.status != 'done'
         AND t.assignee_id IS NOT NULL
+        AND n.id IS NULL
         """
         
-        tasks = execute_query(query, (tomorrow, three_days), fetch_all=True)
+        tasks = await run_in_threadpool(execute_query, query, fetch_all=True)
+        notifications = []
+        emails = []
         
         for task in tasks:
-            # Check if we already sent a reminder for this task today
-            reminder_query = """
-            SELECT COUNT(*) as count FROM notifications
-            WHERE user_id = %s AND task_id = %s
-            AND title = 'Deadline Reminder'
-            AND DATE(created_at) = CURDATE()
-            """
+            # Queue notification for the bulk insert below
+            notifications.append((
+                task['assignee_id'],
+                None,
+                task['id'],
+                "Deadline Reminder",
+                f'Task "{task["title"]}" is due in {task["days_until_due"]} day(s)'
+            ))
             
-            reminder_count = execute_query(reminder_query, (task['assignee_id'], task['id']), fetch_one=True)
-            
-            if reminder_count['count'] == 0:
-                days_until_due = (task['due_date'] - date.today()).days
-                
-                # Create notification
-                DatabaseManager.create_notification(
-                    user_id=task['assignee_id'],
-                    task_id=task['id'],
-                    title="Deadline Reminder",
-                    body=f'Task "{task["title"]}" is due in {days_until_due} day(s)'
-                )
-                
-                # Send email
-                subject = f"Deadline Reminder: {task['title']}"
-                body = f"""
-                Hello {task['assignee_name']},
-                
-                This is a reminder that your task "{task['title']}" in project "{task['project_name']}" is due on {task['due_date']}.
-                
-                Please make sure to complete it on time.
-                
-                Best regards,
-                SynergySphere Team
-                """
-                
-                send_email(task['assignee_email'], subject, body)
-                
+            # Queue email for the batch send below
+            emails.append(email_service.build_deadline_reminder_email(
+                to_email=task['assignee_email'],
+                assignee_name=task['assignee_name'],
+                task_title=task['title'],
+                project_name=task['project_name'],
+                due_date=task['due_date']
+            ))
+        
+        await run_in_threadpool(DatabaseManager.create_notifications_bulk, notifications)
+        email_service.enqueue_bulk(emails)
         logger.info(f"Processed {len(tasks)} deadline reminders")
         
     except Exception as e:
         logger.error(f"Error checking deadlines: {e}")
 
-def send_daily_digest():
+async def send_daily_digest():
     """Send daily digest of notifications (optional feature)"""
     try:
         # This could be expanded to send daily summaries
@@ -0,0 +1,19 @@
+-- SynergySphere migration 001: indexes for hot lookup queries
+-- Brings databases created from an older schema.sql in line with the current one.
+
+USE synergysphere;
+
+-- Membership lookups by user can read project ids straight from the index
+ALTER TABLE project_members
+    DROP INDEX idx_project_members_user,
+    ADD INDEX idx_project_members_user (user_id, project_id);
+
+-- Project task lists are returned in created_at order without a filesort
+ALTER TABLE tasks
+    ADD INDEX idx_tasks_project_created (project_id, created_at),
+    DROP INDEX idx_tasks_project;
+
+-- Notification feeds are returned in created_at order without a filesort
+ALTER TABLE notifications
+    ADD INDEX idx_notifications_user_created (user_id, created_at),
+    DROP INDEX idx_notifications_user;
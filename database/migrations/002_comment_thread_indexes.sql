@@ -0,0 +1,13 @@
+-- SynergySphere migration 002: indexes for comment thread queries
+-- Comment threads are read by project or task in created_at order; these
+-- indexes return them in that order without a filesort.
+
+USE synergysphere;
+
+ALTER TABLE comments
+    ADD INDEX idx_comments_project_created (project_id, created_at),
+    DROP INDEX idx_comments_project;
+
+ALTER TABLE comments
+    ADD INDEX idx_comments_task_created (task_id, created_at),
+    DROP INDEX idx_comments_task;
@@ -0,0 +1,8 @@
+-- SynergySphere migration 003: index for per-project task status counts
+-- Project progress is a GROUP BY status over one project's tasks; this index
+-- answers it from the index alone.
+
+USE synergysphere;
+
+ALTER TABLE tasks
+    ADD INDEX idx_tasks_project_status (project_id, status);
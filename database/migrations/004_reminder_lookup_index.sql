@@ -0,0 +1,8 @@
+-- SynergySphere migration 004: index for the deadline reminder check
+-- The scheduler anti-joins due tasks against today's "Deadline Reminder"
+-- notifications; this index turns each probe into a short range scan.
+
+USE synergysphere;
+
+ALTER TABLE notifications
+    ADD INDEX idx_notifications_task_title_created (task_id, title, created_at);
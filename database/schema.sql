@@ -87,12 +87,14 @@ CREATE TABLE notifications (
 -- Indexes for better performance
 CREATE INDEX idx_projects_owner ON projects(owner_id);
 CREATE INDEX idx_project_members_project ON project_members(project_id);
-CREATE INDEX idx_project_members_user ON project_members(user_id);
-CREATE INDEX idx_tasks_project ON tasks(project_id);
+CREATE INDEX idx_project_members_user ON project_members(user_id, project_id);
+CREATE INDEX idx_tasks_project_created ON tasks(project_id, created_at);
+CREATE INDEX idx_tasks_project_status ON tasks(project_id, status);
 CREATE INDEX idx_tasks_assignee ON tasks(assignee_id);
 CREATE INDEX idx_tasks_status ON tasks(status);
-CREATE INDEX idx_comments_project ON comments(project_id);
-CREATE INDEX idx_comments_task ON comments(task_id);
+CREATE INDEX idx_comments_project_created ON comments(project_id, created_at);
+CREATE INDEX idx_comments_task_created ON comments(task_id, created_at);
 CREATE INDEX idx_comments_parent ON comments(parent_comment_id);
-CREATE INDEX idx_notifications_user ON notifications(user_id);
+CREATE INDEX idx_notifications_user_created ON notifications(user_id, created_at);
+CREATE INDEX idx_notifications_task_title_created ON notifications(task_id, title, created_at);
 CREATE INDEX idx_notifications_read ON notifications(is_read);